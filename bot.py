@@ -1,10 +1,20 @@
+import atexit
+import fcntl
 import signal
 import asyncio
 import time
+import hashlib
+import hmac
 import json
-import re
+import logging
+import weakref
+from collections import OrderedDict
+from typing import NamedTuple
+import aiohttp
 from telegram.ext import (
+    AIORateLimiter,
     Application,
+    ChatMemberHandler,
     CommandHandler,
     MessageHandler,
     filters,
@@ -13,18 +23,209 @@ from telegram.ext import (
 from telegram import Update
 from config import (
     TELEGRAM_BOT_TOKEN,
-    is_monitored_channel,
+    BOT_PASSWORD,
+    PID_FILE,
     add_monitored_channel,
     remove_monitored_channel,
     get_monitored_channels,
 )
 from image_search import ImageSearcher
-from utils import download_image
+from utils import TTLCache, download_image
+from markdown_v2 import (
+    escape_markdown_v2,
+    escape_markdown_v2_preserve_links,
+    escape_markdown_v2_url,
+)
 from logger import logger
 import sys
 import os
 
 EDITED_POSTS_FILE = 'edited_posts.json'
+# Only the most recent edited post IDs are remembered; older posts are never
+# re-delivered by Telegram, so forgetting them is safe.
+EDITED_POSTS_MAX = 50_000
+
+# How long (seconds) a cached "can the bot edit messages here?" answer stays valid.
+PERMISSION_CACHE_TTL = 300
+
+# Authenticated sessions: how long they last and how many are remembered.
+AUTH_SESSION_TTL = 24 * 3600
+AUTH_CACHE_SIZE = 10_000
+
+# Channel renames are rare, so /list_channels reuses fetched titles for an hour.
+CHAT_TITLE_CACHE_TTL = 3600
+
+# Maximum concurrent get_chat calls while building /list_channels.
+LIST_CHANNELS_CONCURRENCY = 10
+
+# Upper bound on posts being downloaded/searched at the same time.
+MAX_CONCURRENT_POSTS = 32
+
+# Signals that trigger a graceful shutdown, installed once on the running loop.
+SHUTDOWN_SIGNALS = (signal.SIGTERM, signal.SIGINT, signal.SIGHUP)
+
+# Shared aiohttp session used for Telegram file downloads.
+HTTP_POOL_SIZE = 64
+HTTP_KEEPALIVE = 60
+
+# Caption edits are queued per channel and sent by one worker per channel, so a
+# rate-limited or slow channel only ever delays its own edits. Each worker
+# coalesces what arrives within EDIT_FLUSH_WINDOW (seconds) of the first edit.
+EDIT_FLUSH_WINDOW = 0.25
+EDIT_BATCH_SIZE = 50
+# Per-channel backlog bound: producers wait (rather than pile up memory) once
+# this many edits are queued for one channel.
+EDIT_QUEUE_MAX = 512
+# Times AIORateLimiter re-sends a call after Telegram answers with RetryAfter.
+EDIT_FLOOD_RETRIES = 2
+# On shutdown, how long (seconds) to keep sending already-queued edits.
+EDIT_DRAIN_TIMEOUT = 30
+
+# Sources found for recently seen images, keyed by Telegram's file_unique_id,
+# so a re-posted picture skips both the download and the Fluffle search.
+SOURCE_CACHE_SIZE = 2048
+SOURCE_CACHE_TTL = 6 * 3600
+
+# MarkdownV2 escaping for our own static templates: every special character
+# except the '*' and '`' they use as formatting.
+_MDV2_STATIC_TRANS = str.maketrans({c: '\\' + c for c in '_[]()~>#+-=|{}.!'})
+
+def _parse_channel_id(raw: str) -> str | None:
+    """Validate a user-supplied channel ID once and return it in canonical form.
+
+    Channel IDs are "-100" followed by at least ten ASCII digits. Returns None
+    for anything else, including "-100abc", "-1000", "-100_123" and non-ASCII
+    digits, which int() alone would accept.
+    """
+    if not (raw.isascii() and raw.startswith('-100') and raw[1:].isdigit()):
+        return None
+    return raw if int(raw) <= -1000000000000 else None
+
+class PendingEdit(NamedTuple):
+    """A caption edit waiting for the edit worker."""
+    channel_id: str
+    message_id: int
+    post_id: str
+    caption: str
+
+# ==============================================================================
+# Static replies
+# ==============================================================================
+
+_START_TEXT = (
+    "Hello! I'm a bot that finds sources for images posted in channels.\n\n"
+    "⚠️ Please authenticate first using:\n"
+    "/password <password>\n\n"
+    "After authentication, you can:\n"
+    "1. Use /add_channel to start monitoring channels\n"
+    "2. Use /delete_channel to remove channels from monitoring\n"
+    "3. Use /pause to temporarily stop processing\n"
+    "4. Use /list_channels to see monitored channels\n"
+    "5. Use /stop <channel_id> to stop updates for a specific channel\n"
+    "6. Use /resume <channel_id> to resume updates for a specific channel\n\n"
+    "Sources are found automatically via the Fluffle reverse-image search."
+)
+
+_AUTH_REQUIRED_TEXT = (
+    "You need to authenticate first!\n"
+    "Use /password <password> to gain access to bot features."
+)
+
+_ADD_CHANNEL_USAGE_TEXT = (
+    "Please provide the channel ID.\n"
+    "Forward a message from your channel to @userinfobot to get the ID."
+)
+
+_INVALID_CHANNEL_ID_TEXT = "Invalid channel ID format. The ID should start with '-100'."
+
+_NOT_MONITORED_TEXT = (
+    "This channel is not in the monitored list.\n"
+    "Use /list_channels to see monitored channels."
+)
+
+_NO_EDIT_PERMISSION_TEXT = (
+    "The bot is not an admin in this channel or lacks editing permissions.\n"
+    "Please add the bot as an admin with the following permissions:\n"
+    "- Edit messages\n"
+    "Then try adding the channel again."
+)
+
+_CHANNEL_NOT_FOUND_TEXT = (
+    "Channel not found. Please make sure:\n"
+    "1. The channel ID is correct\n"
+    "2. The bot is a member of the channel\n"
+    "3. The bot is an admin in the channel"
+)
+
+_ADD_CHANNEL_FAILED_TEXT = (
+    "Failed to add channel. Please make sure:\n"
+    "1. The bot is a member of the channel\n"
+    "2. The bot is an admin in the channel\n"
+    "3. The channel ID is correct"
+)
+
+def _escape_md2_static(text: str) -> str:
+    """Escape a static MarkdownV2 template, keeping its *bold* and `code` markup."""
+    return text.translate(_MDV2_STATIC_TRANS)
+
+# Escaped once at import: the raw template has plenty of '-', '.', '(' and ')'
+# that Telegram rejects unescaped in MarkdownV2.
+_HELP_TEXT = _escape_md2_static("""
+🤖 *Source Bot Help*
+
+*Getting Started*
+1. Add bot to your channel as admin
+2. Get channel ID from @userinfobot (should start with -100)
+3. Authenticate with the password below
+
+*Authentication*
+• `/password <password>` - Bot access authentication
+
+*Channel Management*
+• `/add_channel <channel_id>` - Start monitoring channel
+• `/delete_channel <channel_id>` - Remove channel
+• `/list_channels` - Show all monitored channels
+• `/stop <channel_id>` - Pause specific channel
+• `/resume <channel_id>` - Resume specific channel
+
+*Bot Control*
+• `/start` - Initialize bot
+• `/pause` - Toggle all updates on/off
+• `/help` - Show this help
+
+*Automatic Features*
+• Image Detection: Monitors new posts with images
+• Source Finding: Fluffle reverse-image search
+• Caption Edit: Adds source links automatically
+• Rate Limiting: Prevents API overload
+
+*Supported Platforms*
+• e621
+• Fur Affinity
+• Weasyl
+• Inkbunny
+• Furry Network
+• DeviantArt
+• Twitter (X)
+• Bluesky
+
+*Requirements*
+• Bot must be channel admin
+• Edit messages permission required
+• Channel ID must start with -100
+• Password authentication
+
+*Channel Status Icons*
+• 🟢 Active: Processing images
+• 🔴 Stopped: Updates paused
+
+*Tips*
+• Use /list_channels to monitor status
+• Ensure proper admin permissions
+• Source links appear below captions
+
+Need help? Contact bot administrator.
+""")
 
 class SourceBot:
     def __init__(self):
@@ -32,82 +233,100 @@ class SourceBot:
         self.application = None
         self.start_time = None
         self.is_paused = False
-        self.shutdown_event = asyncio.Event()
-        self.authenticated_users = set()  
-        self.BOT_PASSWORD = "mow"  
+        # Sessions expire after a day; the cap bounds memory for long-running bots.
+        self.authenticated_users = TTLCache(maxsize=AUTH_CACHE_SIZE, ttl=AUTH_SESSION_TTL)
+        # Only a digest of the configured password is kept; compared in constant time.
+        self._pw_hash = hashlib.sha256(BOT_PASSWORD.encode()).digest() if BOT_PASSWORD else None
+        if self._pw_hash is None:
+            logger.warning("BOT_PASSWORD is not set; /password will reject every attempt")
         self.stopped_channels = set()
         self.edited_posts = self._load_edited_posts()  # Track posts that have been edited with source info
-
-        # Set up signal handlers
-        for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
-            signal.signal(sig, self._signal_handler)
+        self._perm_cache: dict[str, tuple[float, bool]] = {}  # channel_id -> (checked_at, can_edit)
+        # Immutable snapshot of config's channel list; rebuilt only when it changes.
+        self._monitored_cache: frozenset[str] = frozenset(get_monitored_channels())
+        self._title_cache: dict[str, tuple[float, str]] = {}  # channel_id -> (fetched_at, title)
+        # channel_id -> pending caption edits, and the worker draining them.
+        self._edit_queues: dict[str, asyncio.Queue] = {}
+        self._edit_workers: dict[str, asyncio.Task] = {}
+        self._source_cache = TTLCache(maxsize=SOURCE_CACHE_SIZE, ttl=SOURCE_CACHE_TTL)
+        self._process_sem = asyncio.Semaphore(MAX_CONCURRENT_POSTS)
+        self._pid_fd: int | None = None  # Locked PID file, held open until exit
+        self._chat_locks: weakref.WeakValueDictionary[str, asyncio.Lock] = weakref.WeakValueDictionary()
 
         logger.info("Bot initialized with enhanced service support")
 
-    def _load_edited_posts(self) -> set:
-        """Load the set of already-edited post IDs from disk."""
+    def _load_edited_posts(self) -> OrderedDict:
+        """Load already-edited post IDs from disk, oldest first, capped at EDITED_POSTS_MAX."""
         try:
             if os.path.exists(EDITED_POSTS_FILE):
                 with open(EDITED_POSTS_FILE, 'r') as f:
                     data = json.load(f)
                     if isinstance(data, list):
                         logger.info(f"Loaded {len(data)} edited post IDs from disk")
-                        return set(data)
+                        return OrderedDict.fromkeys(data[-EDITED_POSTS_MAX:])
         except Exception as e:
             logger.error(f"Failed to load edited posts from disk: {e}")
-        return set()
+        return OrderedDict()
+
+    def _mark_edited(self, post_id: str) -> None:
+        """Record a post as edited, evicting the oldest entries beyond EDITED_POSTS_MAX."""
+        self.edited_posts[post_id] = None
+        self.edited_posts.move_to_end(post_id)
+        while len(self.edited_posts) > EDITED_POSTS_MAX:
+            self.edited_posts.popitem(last=False)
 
     def _save_edited_posts(self) -> None:
-        """Persist the edited_posts set to disk so it survives restarts."""
+        """Persist edited_posts to disk (oldest first) so it survives restarts."""
         try:
             with open(EDITED_POSTS_FILE, 'w') as f:
                 json.dump(list(self.edited_posts), f)
         except Exception as e:
             logger.error(f"Failed to save edited posts to disk: {e}")
 
-    def _signal_handler(self, signum, frame):
-        """Handle system signals for clean shutdown"""
+    def _signal_handler(self, signum: int):
+        """Handle system signals for clean shutdown (runs on the event loop)"""
         sig_name = signal.Signals(signum).name
         logger.info(f"Received signal {sig_name} ({signum}), initiating graceful shutdown...")
-        self.shutdown_event.set()
+        if self.application:
+            self.application.stop_running()
 
     async def cleanup(self):
         """Cleanup resources before shutdown"""
         logger.info("Starting cleanup process...")
         if self.application:
-            await self.application.stop()
+            http = self.application.bot_data.pop('http', None)
+            if http and not http.closed:
+                await http.close()
         await self.image_searcher.cleanup()
         logger.info("Cleanup completed")
 
-    def is_authenticated(self, user_id: int) -> bool:
-        """Check if a user is authenticated"""
-        return user_id in self.authenticated_users
+    async def _can_edit(self, bot, channel_id: str) -> bool:
+        """Return whether the bot may edit messages in a channel, cached per channel."""
+        cached = self._perm_cache.get(channel_id)
+        now = time.monotonic()
+        if cached and now - cached[0] < PERMISSION_CACHE_TTL:
+            return cached[1]
+
+        bot_member = await bot.get_chat_member(chat_id=channel_id, user_id=bot.id)
+        logger.debug("Bot permissions in channel: %s, can_edit_messages: %s", bot_member.status, bot_member.can_edit_messages)
+        can_edit = bool(bot_member.can_edit_messages)
+        self._perm_cache[channel_id] = (now, can_edit)
+        return can_edit
+
+    def _refresh_monitored(self) -> None:
+        """Re-snapshot the monitored channels after /add_channel or /delete_channel."""
+        self._monitored_cache = frozenset(get_monitored_channels())
 
     async def check_auth(self, update: Update) -> bool:
         """Check authentication and send message if not authenticated"""
-        if not self.is_authenticated(update.effective_user.id):
-            await update.message.reply_text(
-                "You need to authenticate first!\n"
-                "Use /password <password> to gain access to bot features."
-            )
+        if update.effective_user.id not in self.authenticated_users:
+            await update.message.reply_text(_AUTH_REQUIRED_TEXT)
             return False
         return True
 
     async def start(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle the /start command"""
-        await update.message.reply_text(
-            "Hello! I'm a bot that finds sources for images posted in channels.\n\n"
-            "⚠️ Please authenticate first using:\n"
-            "/password <password>\n\n"
-            "After authentication, you can:\n"
-            "1. Use /add_channel to start monitoring channels\n"
-            "2. Use /delete_channel to remove channels from monitoring\n"
-            "3. Use /pause to temporarily stop processing\n"
-            "4. Use /list_channels to see monitored channels\n"
-            "5. Use /stop <channel_id> to stop updates for a specific channel\n"
-            "6. Use /resume <channel_id> to resume updates for a specific channel\n\n"
-            "Sources are found automatically via the Fluffle reverse-image search."
-        )
+        await update.message.reply_text(_START_TEXT)
 
     async def handle_password(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle password authentication"""
@@ -115,11 +334,11 @@ class SourceBot:
             await update.message.reply_text("Usage: /password <your_password>")
             return
 
-        provided_password = context.args[0]
+        provided_password = context.args[0].encode()
         user_id = update.effective_user.id
 
-        if provided_password == self.BOT_PASSWORD:
-            self.authenticated_users.add(user_id)
+        if self._pw_hash and hmac.compare_digest(hashlib.sha256(provided_password).digest(), self._pw_hash):
+            self.authenticated_users[user_id] = True
             await update.message.reply_text("Authentication successful! You can now use all bot features.")
             logger.info(f"User {user_id} successfully authenticated")
         else:
@@ -132,35 +351,26 @@ class SourceBot:
             return
 
         if not context.args:
-            await update.message.reply_text(
-                "Please provide the channel ID.\n"
-                "Forward a message from your channel to @userinfobot to get the ID."
-            )
+            await update.message.reply_text(_ADD_CHANNEL_USAGE_TEXT)
             return
 
-        channel_id = context.args[0]
-        if not channel_id.startswith('-100'):
-            await update.message.reply_text(
-                "Invalid channel ID format. The ID should start with '-100'."
-            )
+        channel_id = _parse_channel_id(context.args[0])
+        if channel_id is None:
+            await update.message.reply_text(_INVALID_CHANNEL_ID_TEXT)
             return
 
         try:
-            bot_member = await context.bot.get_chat_member(
-                chat_id=channel_id,
-                user_id=context.bot.id
-            )
-
-            if not bot_member.can_edit_messages:
-                await update.message.reply_text(
-                    "The bot is not an admin in this channel or lacks editing permissions.\n"
-                    "Please add the bot as an admin with the following permissions:\n"
-                    "- Edit messages\n"
-                    "Then try adding the channel again."
-                )
+            # Reuse a cached "yes", but re-check a cached "no": the admin may
+            # have just granted the missing rights before retrying.
+            cached = self._perm_cache.get(channel_id)
+            if cached and not cached[1]:
+                self._perm_cache.pop(channel_id, None)
+            if not await self._can_edit(context.bot, channel_id):
+                await update.message.reply_text(_NO_EDIT_PERMISSION_TEXT)
                 return
 
             add_monitored_channel(channel_id)
+            self._refresh_monitored()
             await update.message.reply_text(
                 f"Channel {channel_id} has been added to the monitoring list.\n"
                 "The bot will now automatically add source links to new image posts."
@@ -169,19 +379,9 @@ class SourceBot:
 
         except Exception as e:
             if "chat not found" in str(e).lower():
-                await update.message.reply_text(
-                    "Channel not found. Please make sure:\n"
-                    "1. The channel ID is correct\n"
-                    "2. The bot is a member of the channel\n"
-                    "3. The bot is an admin in the channel"
-                )
+                await update.message.reply_text(_CHANNEL_NOT_FOUND_TEXT)
             else:
-                await update.message.reply_text(
-                    "Failed to add channel. Please make sure:\n"
-                    "1. The bot is a member of the channel\n"
-                    "2. The bot is an admin in the channel\n"
-                    "3. The channel ID is correct"
-                )
+                await update.message.reply_text(_ADD_CHANNEL_FAILED_TEXT)
             logger.error(f"Error adding channel {channel_id}: {str(e)}")
 
     async def list_channels(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -193,237 +393,338 @@ class SourceBot:
             await update.message.reply_text("No channels are currently being monitored.")
             return
 
-        message = "📋 *Currently monitored channels:*\n\n"
+        # Look up every uncached title at once instead of one get_chat per channel.
+        now = time.monotonic()
+        stale = [
+            channel for channel in channels
+            if now - self._title_cache.get(channel, (float('-inf'), ''))[0] >= CHAT_TITLE_CACHE_TTL
+        ]
+        if stale:
+            # Bounded so a long channel list can't monopolise PTB's connection pool.
+            sem = asyncio.Semaphore(LIST_CHANNELS_CONCURRENCY)
+
+            async def fetch(channel):
+                async with sem:
+                    return await context.bot.get_chat(channel)
+
+            chats = await asyncio.gather(
+                *(fetch(channel) for channel in stale),
+                return_exceptions=True
+            )
+            for channel, chat in zip(stale, chats):
+                if isinstance(chat, Exception):
+                    logger.error(f"Failed to get info for channel {channel}: {str(chat)}")
+                    self._title_cache.pop(channel, None)
+                else:
+                    self._title_cache[channel] = (now, chat.title or "Unknown Channel")
+
+        parts = ["📋 *Currently monitored channels:*\n\n"]
         for channel in channels:
-            try:
-                chat = await context.bot.get_chat(channel)
-                channel_name = chat.title or "Unknown Channel"
-                status = "🔴 Stopped" if channel in self.stopped_channels else "🟢 Active"
-                channel_name = self.escape_markdown_v2(channel_name)
-                message += f"📺 *{channel_name}*\n   ID: `{channel}`\n   Status: {status}\n\n"
-            except Exception as e:
-                logger.error(f"Failed to get info for channel {channel}: {str(e)}")
-                status = "🔴 Stopped" if channel in self.stopped_channels else "🟢 Active"
-                message += f"📺 *Unknown Channel*\n   ID: `{channel}`\n   Status: {status}\n\n"
+            status = "🔴 Stopped" if channel in self.stopped_channels else "🟢 Active"
+            cached = self._title_cache.get(channel)
+            if cached:
+                channel_name = self.escape_markdown_v2(cached[1])
+                parts.append(f"📺 *{channel_name}*\n   ID: `{channel}`\n   Status: {status}\n\n")
+            else:
+                parts.append(f"📺 *Unknown Channel*\n   ID: `{channel}`\n   Status: {status}\n\n")
 
-        await update.message.reply_text(message, parse_mode='MarkdownV2')
+        await update.message.reply_text(''.join(parts), parse_mode='MarkdownV2')
 
     async def handle_channel_post(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle new channel posts"""
         try:
+            # Bind hot attributes once; every update goes through these checks.
+            edited_posts = self.edited_posts
             if self.is_paused:
                 logger.debug("Skipping post processing - bot is paused")
                 return
 
-            # Handle regular, edited, and scheduled posts
-            message = None
-            is_edited_post = False
-            post_type = "unknown"
-            if hasattr(update, 'edited_channel_post') and update.edited_channel_post:
-                message = update.edited_channel_post
-                post_type = "edited"
-                is_edited_post = True
-            elif hasattr(update, 'channel_post') and update.channel_post:
-                message = update.channel_post
-                post_type = "regular"
-
-            if not message:
+            # Handle regular, edited, and scheduled posts (Update always has both attributes)
+            is_edited_post = update.edited_channel_post is not None
+            message = update.edited_channel_post or update.channel_post
+
+            if message is None:
                 logger.debug("No message found")
                 return
 
             channel_id = str(message.chat_id)
             if channel_id in self.stopped_channels:
-                logger.debug(f"Skipping post processing - channel {channel_id} is stopped")
+                logger.debug("Skipping post processing - channel %s is stopped", channel_id)
                 return
 
-            # Check if it's a scheduled post and handle accordingly
-            is_scheduled = getattr(message, 'forward_date', None) is not None or getattr(message, 'has_scheduled_date', False)
-            logger.debug(f"Processing {post_type} channel post (scheduled: {is_scheduled})")
-
-            # We'll use the original message data rather than trying to get_messages
-            # The python-telegram-bot library doesn't have get_messages method
-            try:
-                # Check if we can access this chat
-                chat = await context.bot.get_chat(channel_id)
-                logger.debug(f"Verified access to channel {channel_id}")
-            except Exception as e:
-                logger.error(f"Failed to access channel {channel_id}: {str(e)}")
-                # Continue with the process even if we can't get fresh chat data
-
-            if self.start_time and message.date and message.date.timestamp() < self.start_time:
-                logger.debug(f"Skipping old message from before bot start: {message.message_id}")
+            if channel_id not in self._monitored_cache:
+                logger.debug("Channel %s is not in monitored list", channel_id)
                 return
 
-            if not is_monitored_channel(channel_id):
-                logger.debug(f"Channel {channel_id} is not in monitored list")
+            if self.start_time and message.date and message.date.timestamp() < self.start_time:
+                logger.debug("Skipping old message from before bot start: %s", message.message_id)
                 return
 
-            # Get photo from the message
-            photo = None
-            if message.photo:
-                photo = message.photo[-1]
-                logger.debug("Found photo in regular message")
-            elif hasattr(message, 'photo') and message.photo:
-                photo = message.photo[-1]
-                logger.debug("Found photo in scheduled message")
-
-            if not photo:
+            # Get photo from the message (largest size last)
+            if not message.photo:
                 logger.debug("Post does not contain a photo")
                 return
+            photo = message.photo[-1]
                 
             # Create a unique identifier for this post
             post_id = f"{channel_id}:{message.message_id}"
             
             # Check if we've already edited this post
-            if post_id in self.edited_posts:
+            if post_id in edited_posts:
                 logger.info(f"Skipping already edited post {message.message_id} in channel {channel_id}")
                 return
                 
             # If this is an edited post that we didn't edit, skip it (respect manual edits)
-            if is_edited_post and post_id not in self.edited_posts:
+            if is_edited_post and post_id not in edited_posts:
                 logger.info(f"Skipping manually edited post {message.message_id} in channel {channel_id}")
                 # Add to edited posts set to prevent future edit attempts, and persist
-                self.edited_posts.add(post_id)
+                self._mark_edited(post_id)
                 self._save_edited_posts()
                 return
 
-            original_caption = message.caption or ""
+            # All cheap gates passed; the scheduled-post probe only feeds this debug line.
+            if logger.isEnabledFor(logging.DEBUG):
+                post_type = "edited" if is_edited_post else "regular"
+                is_scheduled = getattr(message, 'forward_date', None) is not None or getattr(message, 'has_scheduled_date', False)
+                logger.debug("Processing %s channel post (scheduled: %s)", post_type, is_scheduled)
+
+            # Download, search and edit off the update loop so a slow Fluffle
+            # lookup never holds up other channels or commands. Tasks created via
+            # the application are awaited by Application.stop(), while the bot
+            # client is still open.
+            context.application.create_task(
+                self._process_post(context.bot, message, channel_id, post_id, photo)
+            )
+
+        except Exception as e:
+            logger.error(f"Error handling channel post: {str(e)}", exc_info=True)
 
-            if len(original_caption) > 1000:  
-                logger.warning(f"Caption too long in channel {channel_id}, truncating")
-                original_caption = original_caption[:997] + "..."
+    async def _process_post(self, bot, message, channel_id: str, post_id: str, photo):
+        """Background worker: download, reverse-search and queue the caption edit.
 
-            logger.info(f"Processing new image post in channel {channel_id}")
+        Posts from the same channel are processed in order; different channels
+        run concurrently, capped by MAX_CONCURRENT_POSTS.
+        """
+        lock = self._chat_locks.get(channel_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._chat_locks[channel_id] = lock
 
+        async with lock, self._process_sem:
             try:
-                bot_member = await context.bot.get_chat_member(
-                    chat_id=channel_id,
-                    user_id=context.bot.id
-                )
-                logger.debug(f"Bot permissions in channel: {bot_member.status}, can_edit_messages: {bot_member.can_edit_messages}")
+                logger.info(f"Processing new image post in channel {channel_id}")
 
-                if not bot_member.can_edit_messages:
+                # file_unique_id is the same wherever a picture is re-posted.
+                source = self._source_cache.get(photo.file_unique_id)
+
+                # The permission check and the download are independent; overlap them.
+                jobs = [self._can_edit(bot, channel_id)]
+                if source is None:
+                    jobs.append(download_image(photo.file_id, bot, self.application.bot_data.get('http')))
+                can_edit, *downloaded = await asyncio.gather(*jobs, return_exceptions=True)
+
+                if isinstance(can_edit, Exception):
+                    self._perm_cache.pop(channel_id, None)
+                    logger.error(f"Failed to check bot permissions: {str(can_edit)}")
+                    return
+                if not can_edit:
                     logger.error(f"Bot lacks edit permissions in channel {channel_id}")
                     return
 
-            except Exception as e:
-                logger.error(f"Failed to check bot permissions: {str(e)}")
-                return
-
-            image_data = await download_image(photo.file_id, context.bot)
-            if not image_data:
-                logger.error(f"Failed to download image from channel {channel_id}")
-                return
+                if source is not None:
+                    logger.debug("Reusing cached source for image from channel %s", channel_id)
+                else:
+                    image_data = downloaded[0]
+                    if isinstance(image_data, Exception) or not image_data:
+                        logger.error(f"Failed to download image from channel {channel_id}")
+                        return
 
-            logger.debug(f"Searching Fluffle for source of image from channel {channel_id}")
-            source = await self.image_searcher.search_image(context.bot, image_data)
+                    logger.debug("Searching Fluffle for source of image from channel %s", channel_id)
+                    source = await self.image_searcher.search_image(bot, image_data)
 
-            try:
-                # Initialize variables to avoid undefined references in error handling
-                new_caption = ""
-                
-                if source:
-                    escaped_url = source['source_url']
-                    author_nickname = source.get('author_nickname', '')
-                    
-                    # Create link text with author nickname if available
-                    if author_nickname == "BLUESKY_GENERIC_ATTRIBUTION":
-                        # Special handling for Bluesky with generic attribution
-                        link_text = "*Автор на Bluesky 💎*"
-                    elif author_nickname:
-                        # Escape any special characters in the nickname for MarkdownV2 format
-                        escaped_nickname = self.escape_markdown_v2(author_nickname)
-                        link_text = f"*by {escaped_nickname}*"
-                    else:
-                        # Fall back to platform name so the link still reads naturally
-                        # (e.g. "on e621" / "on Fur Affinity") instead of the generic "by artist".
-                        # Fluffle already gives us the platform name in the result.
-                        platform = source.get('source_name') or 'Source'
-                        escaped_platform = self.escape_markdown_v2(platform)
-                        link_text = f"*on {escaped_platform}*"
-
-                    # Log original caption with any existing links
-                    logger.debug(f"Original caption before escaping: {original_caption}")
-
-                    # Properly escape original caption while preserving existing links
-                    escaped_caption = self.escape_markdown_v2_preserve_links(original_caption)
-                    logger.debug(f"Escaped caption with preserved links: {escaped_caption}")
-
-                    # Build new caption
-                    if escaped_caption:
-                        new_caption = f"{escaped_caption}\n\n[{link_text}]({escaped_url})"
-                    else:
-                        new_caption = f"[{link_text}]({escaped_url})"
-
-                    logger.debug(f"Final caption with source attribution: {new_caption}")
-
-                    # Race-condition guard: if the post was manually edited while we were
-                    # doing the (slow) image search, the edit handler already added it to
-                    # edited_posts and returned.  We must not overwrite the user's changes.
-                    if post_id in self.edited_posts:
-                        logger.info(f"Post {message.message_id} was manually edited during processing, skipping source update")
+                    if not source:
+                        logger.info(f"No source found for message {message.message_id} in channel {channel_id}, leaving post unedited")
                         return
-
-                    await context.bot.edit_message_caption(
-                        chat_id=message.chat_id,
-                        message_id=message.message_id,
-                        caption=new_caption,
-                        parse_mode='MarkdownV2'
-                    )
-                    # Add to edited posts set to prevent re-editing, and persist to disk
-                    self.edited_posts.add(post_id)
-                    self._save_edited_posts()
-                    logger.info(f"Successfully updated post {message.message_id} in channel {channel_id}")
+                    self._source_cache[photo.file_unique_id] = source
+
+                escaped_url = escape_markdown_v2_url(source['source_url'])
+                author_nickname = source.get('author_nickname', '')
+
+                # Create link text with author nickname if available
+                if author_nickname == "BLUESKY_GENERIC_ATTRIBUTION":
+                    # Special handling for Bluesky with generic attribution
+                    link_text = "*Автор на Bluesky 💎*"
+                elif author_nickname:
+                    # Escape any special characters in the nickname for MarkdownV2 format
+                    escaped_nickname = self.escape_markdown_v2(author_nickname)
+                    link_text = f"*by {escaped_nickname}*"
                 else:
-                    logger.info(f"No source found for message {message.message_id} in channel {channel_id}, leaving post unedited")
+                    # Fall back to platform name so the link still reads naturally
+                    # (e.g. "on e621" / "on Fur Affinity") instead of the generic "by artist".
+                    # Fluffle already gives us the platform name in the result.
+                    platform = source.get('source_name') or 'Source'
+                    escaped_platform = self.escape_markdown_v2(platform)
+                    link_text = f"*on {escaped_platform}*"
+
+                # Only touch the caption once we know there is a source to append.
+                original_caption = message.caption or ""
+                if len(original_caption) > 1000:
+                    logger.warning(f"Caption too long in channel {channel_id}, truncating")
+                    original_caption = original_caption[:997] + "..."
+
+                # Properly escape original caption (once) while preserving existing links
+                escaped_caption = (
+                    self.escape_markdown_v2_preserve_links(original_caption) if original_caption else ""
+                )
+
+                # Build new caption
+                source_link = f"[{link_text}]({escaped_url})"
+                new_caption = f"{escaped_caption}\n\n{source_link}" if escaped_caption else source_link
+
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Original caption before escaping: %s", original_caption)
+                    logger.debug("Escaped caption with preserved links: %s", escaped_caption)
+                    logger.debug("Final caption with source attribution: %s", new_caption)
+
+                # Hand the edit to the channel's batching worker; it applies the
+                # race-condition guard against manual edits right before calling Telegram.
+                await self._edit_queue_for(channel_id).put(
+                    PendingEdit(channel_id, message.message_id, post_id, new_caption)
+                )
 
             except Exception as e:
-                error_message = str(e).lower()
-                if "not enough rights" in error_message:
-                    logger.error(f"Bot lacks edit permissions in channel {channel_id}")
-                elif "message is not modified" in error_message:
-                    logger.info(f"Caption already contains the correct source in channel {channel_id}")
-                    # Add to edited posts set to prevent future re-edit attempts
-                    self.edited_posts.add(post_id)
-                    self._save_edited_posts()
-                elif "message to edit not found" in error_message:
-                    logger.error(f"Message {message.message_id} not found in channel {channel_id}")
-                else:
-                    logger.error(f"Failed to edit message in channel {channel_id}: {str(e)}")
-                    if 'new_caption' in locals():
-                        logger.debug(f"Failed caption content: {new_caption}")
-                    else:
-                        logger.debug("No caption content available")
+                logger.error(f"Error processing post {message.message_id} in channel {channel_id}: {str(e)}", exc_info=True)
 
-        except Exception as e:
-            logger.error(f"Error handling channel post: {str(e)}", exc_info=True)
+    def _edit_queue_for(self, channel_id: str) -> asyncio.Queue:
+        """Return the channel's edit queue, starting its worker on first use."""
+        queue = self._edit_queues.get(channel_id)
+        if queue is None:
+            queue = self._edit_queues[channel_id] = asyncio.Queue(maxsize=EDIT_QUEUE_MAX)
+            self._edit_workers[channel_id] = asyncio.create_task(self._edit_worker(queue))
+        return queue
 
-    def escape_markdown_v2_preserve_links(self, text: str) -> str:
-        """Escape special characters for MarkdownV2 format while preserving links"""
-        if not text:
-            return ""
+    async def _edit_worker(self, queue: asyncio.Queue):
+        """Drain one channel's edit queue, coalescing bursts into batches.
+
+        Edits within a channel go out one at a time: AIORateLimiter spaces them
+        by the group limit anyway, and waiting here holds up no other channel.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await queue.get()]
+            # The window is fixed from the first edit; later arrivals don't extend it.
+            deadline = loop.time() + EDIT_FLUSH_WINDOW
+            while len(batch) < EDIT_BATCH_SIZE:
+                try:
+                    batch.append(
+                        await asyncio.wait_for(queue.get(), timeout=max(0, deadline - loop.time()))
+                    )
+                except asyncio.TimeoutError:
+                    break
+
+            # Only the newest caption for a given post is worth sending.
+            latest = {edit.post_id: edit for edit in batch}
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Dispatching %s caption edit(s) (%s queued)", len(latest), len(batch))
+            marked = False
+            for edit in latest.values():
+                marked |= await self._edit_one(edit)
+            # Persist edited_posts once per batch rather than once per edit.
+            if marked:
+                self._save_edited_posts()
+            for _ in batch:
+                queue.task_done()
+
+    async def _edit_one(self, edit: PendingEdit) -> bool:
+        """Apply a single queued caption edit, mirroring the old inline error handling.
+
+        Returns True if the post was added to edited_posts (the caller persists it).
+        """
+        channel_id = edit.channel_id
+        post_id = edit.post_id
+
+        # Race-condition guard: if the post was manually edited while we were
+        # doing the (slow) image search, the edit handler already added it to
+        # edited_posts and returned.  We must not overwrite the user's changes.
+        if post_id in self.edited_posts:
+            logger.info(f"Post {edit.message_id} was manually edited during processing, skipping source update")
+            return False
 
-        # First, temporarily replace markdown links with placeholders
-        links = []
-        pattern = r'\[(.*?)\]\((.*?)\)'
+        try:
+            await self.application.bot.edit_message_caption(
+                chat_id=channel_id,
+                message_id=edit.message_id,
+                caption=edit.caption,
+                parse_mode='MarkdownV2'
+            )
+            # Add to edited posts set to prevent re-editing
+            self._mark_edited(post_id)
+            logger.info(f"Successfully updated post {edit.message_id} in channel {channel_id}")
+            return True
 
-        def replace_link(match):
-            links.append(match.group(0))
-            return f"LINK_PLACEHOLDER_{len(links)-1}_"
+        except Exception as e:
+            error_message = str(e).lower()
+            if "not enough rights" in error_message:
+                # Rights were revoked since the cached check; force a fresh lookup.
+                self._perm_cache.pop(channel_id, None)
+                logger.error(f"Bot lacks edit permissions in channel {channel_id}")
+            elif "message is not modified" in error_message:
+                logger.info(f"Caption already contains the correct source in channel {channel_id}")
+                # Add to edited posts set to prevent future re-edit attempts
+                self._mark_edited(post_id)
+                return True
+            elif "message to edit not found" in error_message:
+                logger.error(f"Message {edit.message_id} not found in channel {channel_id}")
+            else:
+                logger.error(f"Failed to edit message in channel {channel_id}: {str(e)}")
+                logger.debug("Failed caption content: %s", edit.caption)
+        return False
+
+    async def _on_start(self, application: Application):
+        """PTB post_init hook: start the searcher and background workers on the polling loop."""
+        # One pooled HTTP session for Telegram file downloads, kept for the bot's lifetime.
+        application.bot_data['http'] = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=HTTP_POOL_SIZE, keepalive_timeout=HTTP_KEEPALIVE)
+        )
+        await self.image_searcher.start()
+        logger.info("Image searcher (Fluffle) initialized")
 
-        text_with_placeholders = re.sub(pattern, replace_link, text)
+        # Registered on the running loop so the handler runs as a normal callback
+        # rather than interrupting arbitrary Python code.
+        loop = asyncio.get_running_loop()
+        for sig in SHUTDOWN_SIGNALS:
+            loop.add_signal_handler(sig, self._signal_handler, sig)
 
-        # Escape special characters
-        special_chars = ['_', '*', '[', ']', '(', ')', '~', '`', '>', '#', '+', '-', '=', '|', '{', '}', '.', '!']
-        escaped_text = text_with_placeholders
-        for char in special_chars:
-            escaped_text = escaped_text.replace(char, f'\\{char}')
+    async def _on_stop(self, application: Application):
+        """PTB post_stop hook: flush queued edits while the bot client is still open.
 
-        # Restore links
-        for i, link in enumerate(links):
-            escaped_text = escaped_text.replace(f"LINK_PLACEHOLDER_{i}_", link)
+        Application.stop() has already awaited the _process_post tasks, so the
+        queues only shrink from here; the workers never return and are
+        cancelled once drained (or the drain times out).
+        """
+        queues = list(self._edit_queues.values())
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(queue.join() for queue in queues)), timeout=EDIT_DRAIN_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            dropped = sum(queue.qsize() for queue in queues)
+            logger.warning(f"Dropping {dropped} queued caption edit(s) on shutdown")
+        workers = list(self._edit_workers.values())
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        if workers:
+            # A batch cut short by the cancel may have marked posts it never saved.
+            self._save_edited_posts()
+
+    async def _on_shutdown(self, application: Application):
+        """PTB post_shutdown hook: release resources on the same loop they were created on."""
+        await self.cleanup()
 
-        return escaped_text
+    def escape_markdown_v2_preserve_links(self, text: str) -> str:
+        """Escape special characters for MarkdownV2 format while preserving links"""
+        return escape_markdown_v2_preserve_links(text)
 
     async def pause_bot(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle the /pause command to toggle bot's processing state"""
@@ -446,18 +747,13 @@ class SourceBot:
             )
             return
 
-        channel_id = context.args[0]
-        if not channel_id.startswith('-100'):
-            await update.message.reply_text(
-                "Invalid channel ID format. The ID should start with '-100'."
-            )
+        channel_id = _parse_channel_id(context.args[0])
+        if channel_id is None:
+            await update.message.reply_text(_INVALID_CHANNEL_ID_TEXT)
             return
 
-        if not is_monitored_channel(channel_id):
-            await update.message.reply_text(
-                "This channel is not in the monitored list.\n"
-                "Use /list_channels to see monitored channels."
-            )
+        if channel_id not in self._monitored_cache:
+            await update.message.reply_text(_NOT_MONITORED_TEXT)
             return
 
         self.stopped_channels.add(channel_id)
@@ -480,7 +776,11 @@ class SourceBot:
             )
             return
 
-        channel_id = context.args[0]
+        channel_id = _parse_channel_id(context.args[0])
+        if channel_id is None:
+            await update.message.reply_text(_INVALID_CHANNEL_ID_TEXT)
+            return
+
         if channel_id not in self.stopped_channels:
             await update.message.reply_text(
                 "This channel is not stopped.\n"
@@ -507,21 +807,17 @@ class SourceBot:
             )
             return
 
-        channel_id = context.args[0]
-        if not channel_id.startswith('-100'):
-            await update.message.reply_text(
-                "Invalid channel ID format. The ID should start with '-100'."
-            )
+        channel_id = _parse_channel_id(context.args[0])
+        if channel_id is None:
+            await update.message.reply_text(_INVALID_CHANNEL_ID_TEXT)
             return
 
-        if not is_monitored_channel(channel_id):
-            await update.message.reply_text(
-                "This channel is not in the monitored list.\n"
-                "Use /list_channels to see monitored channels."
-            )
+        if channel_id not in self._monitored_cache:
+            await update.message.reply_text(_NOT_MONITORED_TEXT)
             return
 
         remove_monitored_channel(channel_id)
+        self._refresh_monitored()
         await update.message.reply_text(
             f"Channel {channel_id} has been removed from the monitoring list.\n"
             "The bot will no longer process posts from this channel."
@@ -533,65 +829,15 @@ class SourceBot:
         if not await self.check_auth(update):
             return
 
-        help_text = """
-        🤖 *Source Bot Help*
-
-        *Getting Started*
-        1. Add bot to your channel as admin
-        2. Get channel ID from @userinfobot (should start with -100)
-        3. Authenticate with the password below
-
-        *Authentication*
-        • `/password <password>` - Bot access authentication
-
-        *Channel Management*
-        • `/add_channel <channel_id>` - Start monitoring channel
-        • `/delete_channel <channel_id>` - Remove channel
-        • `/list_channels` - Show all monitored channels
-        • `/stop <channel_id>` - Pause specific channel
-        • `/resume <channel_id>` - Resume specific channel
-
-        *Bot Control*
-        • `/start` - Initialize bot
-        • `/pause` - Toggle all updates on/off
-        • `/help` - Show this help
-
-        *Automatic Features*
-        • Image Detection: Monitors new posts with images
-        • Source Finding: Fluffle reverse-image search
-        • Caption Edit: Adds source links automatically
-        • Rate Limiting: Prevents API overload
-
-        *Supported Platforms*
-        • e621
-        • Fur Affinity
-        • Weasyl
-        • Inkbunny
-        • Furry Network
-        • DeviantArt
-        • Twitter (X)
-        • Bluesky
-
-        *Requirements*
-        • Bot must be channel admin
-        • Edit messages permission required
-        • Channel ID must start with -100
-        • Password authentication
-
-        *Channel Status Icons*
-        • 🟢 Active: Processing images
-        • 🔴 Stopped: Updates paused
-
-        *Tips*
-        • Use /list_channels to monitor status
-        • Ensure proper admin permissions
-        • Source links appear below captions
-
-        Need help? Contact bot administrator.
-        """
-        await update.message.reply_text(help_text, parse_mode='MarkdownV2')
+        await update.message.reply_text(_HELP_TEXT, parse_mode='MarkdownV2')
         logger.debug("Sent help message to user")
 
+    async def handle_my_chat_member(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Invalidate the cached edit permission when the bot's own rights in a chat change"""
+        channel_id = str(update.my_chat_member.chat.id)
+        if self._perm_cache.pop(channel_id, None) is not None:
+            logger.info(f"Bot membership changed in channel {channel_id}, permission cache cleared")
+
     async def error_handler(self, update: object, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Handle errors in the telegram-python-bot library"""
         logger.error(f"Exception while handling an update: {context.error}")
@@ -599,42 +845,74 @@ class SourceBot:
 
     def escape_markdown_v2(self, text):
         """Escape special characters for MarkdownV2 format"""
-        special_chars = ['_', '*', '[', ']', '(', ')', '~', '`', '>', '#', '+', '-', '=', '|', '{', '}', '.', '!']
-        escaped_text = text
-        for char in special_chars:
-            escaped_text = escaped_text.replace(char, f'\\{char}')
-        return escaped_text
+        return escape_markdown_v2(text)
 
     def run(self):
         """Run the bot with service support"""
         try:
-            self.application = Application.builder().token(TELEGRAM_BOT_TOKEN).build()
+            self.application = (
+                Application.builder()
+                .token(TELEGRAM_BOT_TOKEN)
+                # The default 256-connection pool is plenty; the longer pool
+                # timeout lets bursts of edits and permission checks queue for a
+                # connection instead of failing after PTB's default 1 s.
+                .pool_timeout(30.0)
+                .connect_timeout(15.0)
+                .read_timeout(30.0)
+                # Keeps us under Telegram's flood limits instead of eating 429s.
+                # Every call with a negative chat_id (all channel calls, including
+                # get_chat_member and get_chat) shares a 20-per-minute limit per
+                # channel. Edits are dispatched by one worker per channel, so
+                # that wait (and a RetryAfter retry on a flood error) only ever
+                # delays the channel that hit the limit.
+                .rate_limiter(AIORateLimiter(max_retries=EDIT_FLOOD_RETRIES))
+                .post_init(self._on_start)
+                .post_stop(self._on_stop)
+                .post_shutdown(self._on_shutdown)
+                .build()
+            )
             self.start_time = time.time()
             logger.info(f"Bot starting at timestamp: {self.start_time}")
 
-            self.application.add_handler(CommandHandler("start", self.start))
-            self.application.add_handler(CommandHandler("password", self.handle_password))
-            self.application.add_handler(CommandHandler("add_channel", self.add_channel))
-            self.application.add_handler(CommandHandler("delete_channel", self.delete_channel))
-            self.application.add_handler(CommandHandler("list_channels", self.list_channels))
-            self.application.add_handler(CommandHandler("pause", self.pause_bot))
-            self.application.add_handler(CommandHandler("stop", self.stop_channel))
-            self.application.add_handler(CommandHandler("resume", self.resume_channel))
-            self.application.add_handler(CommandHandler("help", self.help_command))
-            self.application.add_handler(MessageHandler(
-                (filters.ChatType.CHANNEL & filters.PHOTO) |
-                (filters.ChatType.CHANNEL & filters.UpdateType.EDITED_CHANNEL_POST),
-                self.handle_channel_post
-            ))
+            # Channel posts are by far the most frequent update, so their handler
+            # is checked first; commands follow.
+            self.application.add_handlers([
+                MessageHandler(
+                    (filters.ChatType.CHANNEL & filters.PHOTO) |
+                    (filters.ChatType.CHANNEL & filters.UpdateType.EDITED_CHANNEL_POST),
+                    self.handle_channel_post
+                ),
+                ChatMemberHandler(self.handle_my_chat_member, ChatMemberHandler.MY_CHAT_MEMBER),
+                CommandHandler("start", self.start),
+                CommandHandler("password", self.handle_password),
+                CommandHandler("add_channel", self.add_channel),
+                CommandHandler("delete_channel", self.delete_channel),
+                CommandHandler("list_channels", self.list_channels),
+                CommandHandler("pause", self.pause_bot),
+                CommandHandler("stop", self.stop_channel),
+                CommandHandler("resume", self.resume_channel),
+                CommandHandler("help", self.help_command),
+            ])
 
             self.application.add_error_handler(self.error_handler)
 
-            asyncio.get_event_loop().run_until_complete(self.image_searcher.start())
-            logger.info("Image searcher (Fluffle) initialized")
-
             pid = os.getpid()
-            with open('/tmp/telegram_bot.pid', 'w') as f:
-                f.write(str(pid))
+            # Hold an exclusive advisory lock on the PID file for the life of the
+            # process (the kernel drops it on exit), so a second instance fails
+            # fast instead of silently overwriting ours.
+            self._pid_fd = os.open(PID_FILE, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(self._pid_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                logger.error(f"Another bot instance is already running (lock held on {PID_FILE})")
+                sys.exit(1)
+            os.ftruncate(self._pid_fd, 0)
+            os.write(self._pid_fd, f"{pid}\n".encode())
+            # Never unlink the lock file: a process blocked on the old inode could
+            # then lock it while a newcomer locks a fresh file at the same path.
+            # Just clear our PID on exit (atexit also covers sys.exit() paths);
+            # the lock itself goes away with the fd.
+            atexit.register(os.ftruncate, self._pid_fd, 0)
             logger.info(f"Bot running with PID: {pid}")
 
             self.application.run_polling(
@@ -646,11 +924,6 @@ class SourceBot:
             logger.error(f"Critical error: {str(e)}", exc_info=True)
             sys.exit(1)
         finally:
-            asyncio.get_event_loop().run_until_complete(self.cleanup())
-            try:
-                os.remove('/tmp/telegram_bot.pid')
-            except:
-                pass
             logger.info("Bot shutdown complete")
 
 if __name__ == "__main__":
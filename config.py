@@ -1,7 +1,7 @@
 import os
 import json
 from pathlib import Path
-from typing import List
+from typing import Dict, List
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -23,12 +23,20 @@ LOGS_DIR.mkdir(parents=True, exist_ok=True)
 
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "")
 
+# Password for /password. Leave unset to disable authentication (and with it
+# every admin command).
+BOT_PASSWORD = os.getenv("BOT_PASSWORD", "")
+
 # ==============================================================================
 # Persistent Files
 # ==============================================================================
 
 CHANNELS_FILE = DATA_DIR / "monitored_channels.json"
 
+# Runtime PID file. Prefer the per-user runtime dir (tmpfs, cleaned on logout)
+# over the world-writable /tmp.
+PID_FILE = Path(os.getenv("XDG_RUNTIME_DIR") or "/tmp") / "telegram_bot.pid"
+
 # ==============================================================================
 # Logging
 # ==============================================================================
@@ -129,7 +137,7 @@ PLATFORM_DISPLAY_NAMES = {
 META_ARTIST_TAGS = {
     "unknown_artist", "anonymous_artist", "avoid_posting", "third-party_edit",
     "sound_warning", "epilepsy_warning", "ai_generated", "stable_diffusion",
-    "novelai",
+    "novelai", "conditional_dnp",
 }
 
 # ==============================================================================
@@ -159,14 +167,19 @@ def _load_channels() -> List[str]:
 
 
 def _save_channels(channels: List[str]) -> None:
+    # Write to a sibling temp file and rename over the original, so a crash
+    # mid-write can never leave a truncated channels file behind.
+    tmp_file = CHANNELS_FILE.with_name(CHANNELS_FILE.name + ".tmp")
     try:
-        with open(CHANNELS_FILE, "w") as f:
+        with open(tmp_file, "w") as f:
             json.dump(channels, f, indent=2)
+        os.replace(tmp_file, CHANNELS_FILE)
     except Exception as e:
         print(f"Error saving channels: {e}")
 
 
-MONITORED_CHANNELS = _load_channels()
+# Insertion-ordered set: O(1) membership, stable order for /list_channels.
+MONITORED_CHANNELS: Dict[str, None] = dict.fromkeys(_load_channels())
 
 
 def is_monitored_channel(channel_id: str) -> bool:
@@ -174,16 +187,16 @@ def is_monitored_channel(channel_id: str) -> bool:
 
 
 def get_monitored_channels() -> List[str]:
-    return MONITORED_CHANNELS
+    return list(MONITORED_CHANNELS)
 
 
 def add_monitored_channel(channel_id: str) -> None:
     if channel_id not in MONITORED_CHANNELS:
-        MONITORED_CHANNELS.append(channel_id)
-        _save_channels(MONITORED_CHANNELS)
+        MONITORED_CHANNELS[channel_id] = None
+        _save_channels(list(MONITORED_CHANNELS))
 
 
 def remove_monitored_channel(channel_id: str) -> None:
     if channel_id in MONITORED_CHANNELS:
-        MONITORED_CHANNELS.remove(channel_id)
-        _save_channels(MONITORED_CHANNELS)
+        del MONITORED_CHANNELS[channel_id]
+        _save_channels(list(MONITORED_CHANNELS))
@@ -1,4 +1,5 @@
 import asyncio
+import functools
 import io
 import re
 from typing import Optional, Dict, List
@@ -21,15 +22,23 @@ from config import (
     META_ARTIST_TAGS,
 )
 from logger import logger
+from utils import image_executor
 
+# Patterns used per result/credit, compiled once at import.
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]")
+_ARTIST_SUFFIX_RE = re.compile(r"_\(artist\)$")
 
+
+@functools.lru_cache(maxsize=64)
 def _normalize_platform(platform: str) -> str:
     """Reduce a platform name to lowercase-alphanumeric for robust matching.
 
     Fluffle returns camelCase machine names ("furAffinity"); this makes lookups
     tolerant of casing/spacing ("Fur Affinity", "furaffinity", ... all match).
+    Fluffle only ever returns a handful of distinct names, so results are
+    memoised: each is normalised once per process, not once per result.
     """
-    return re.sub(r"[^a-z0-9]", "", (platform or "").lower())
+    return _NON_ALNUM_RE.sub("", (platform or "").lower())
 
 # Marker understood by bot.py: attribute a Bluesky post generically when Fluffle
 # returns no artist credit for it (preserves the previous product behaviour).
@@ -39,6 +48,17 @@ BLUESKY_GENERIC_ATTRIBUTION = "BLUESKY_GENERIC_ATTRIBUTION"
 # client at a time, so we serialise and pace calls to stay well within budget.
 _MIN_SEARCH_INTERVAL = 2.0
 
+# Connection pool for the shared Fluffle session. aiohttp's default 15 s
+# keep-alive would drop the warm TLS connection between most channel posts.
+_POOL_SIZE = 4
+_KEEPALIVE_TIMEOUT = 120
+
+# Upper bound on artist credits considered for a single result.
+_MAX_CREDITS = 16
+
+# Bytes of a failed response's body kept for the log message.
+_ERROR_BODY_LIMIT = 300
+
 # Rank lookup for match tiers, keyed lowercase, e.g. {"exact": 0, "tossup": 1, ...}
 _MATCH_RANK = {name.lower(): i for i, name in enumerate(MATCH_ORDER)}
 
@@ -71,8 +91,13 @@ class ImageSearcher:
     async def _get_session(self) -> aiohttp.ClientSession:
         if self._session is None or self._session.closed:
             # Fluffle requires a descriptive, identifiable User-Agent on every call.
+            # Requests are serialised, so a tiny pool whose idle connection
+            # outlives typical gaps between posts is all that's needed.
             self._session = aiohttp.ClientSession(
-                headers={"User-Agent": FLUFFLE_USER_AGENT}
+                headers={"User-Agent": FLUFFLE_USER_AGENT},
+                connector=aiohttp.TCPConnector(
+                    limit=_POOL_SIZE, keepalive_timeout=_KEEPALIVE_TIMEOUT
+                ),
             )
         return self._session
 
@@ -83,30 +108,31 @@ class ImageSearcher:
         when no sufficiently confident match is found. ``bot`` is accepted for
         backwards compatibility with the previous call signature and is unused.
         """
+        loop = asyncio.get_running_loop()
         async with self._lock:
             # Basic client-side pacing between requests.
-            now = asyncio.get_event_loop().time()
-            gap = now - self._last_search_time
+            gap = loop.time() - self._last_search_time
             if gap < _MIN_SEARCH_INTERVAL:
                 await asyncio.sleep(_MIN_SEARCH_INTERVAL - gap)
 
             try:
                 # Downscale/re-encode off the event loop (PIL is blocking).
-                payload = await asyncio.get_event_loop().run_in_executor(
-                    None, self._prepare_image, image_data
+                payload = await loop.run_in_executor(
+                    image_executor, self._prepare_image, image_data
                 )
                 response = await self._query_fluffle(payload)
             except Exception as e:
                 logger.error(f"Error during Fluffle image search: {e}", exc_info=True)
                 response = None
             finally:
-                self._last_search_time = asyncio.get_event_loop().time()
+                self._last_search_time = loop.time()
 
         if not response:
             return None
 
-        results = response.get("results") or []
-        logger.debug(f"Fluffle returned {len(results)} result(s)")
+        # Never trust the server to honour `limit`: bound the work per response.
+        results = (response.get("results") or [])[:FLUFFLE_LIMIT]
+        logger.debug("Fluffle returned %s result(s)", len(results))
 
         best = self._select_best_result(results)
         if not best:
@@ -168,7 +194,16 @@ class ImageSearcher:
                     if resp.status == 200:
                         return await resp.json()
 
-                    body = (await resp.text())[:300]
+                    # Only the head of an error body is ever logged; cap the
+                    # read instead of buffering and decoding the whole page.
+                    # read(n) returns whatever is buffered, so loop to n or EOF.
+                    head = bytearray()
+                    while len(head) < _ERROR_BODY_LIMIT:
+                        chunk = await resp.content.read(_ERROR_BODY_LIMIT - len(head))
+                        if not chunk:
+                            break
+                        head += chunk
+                    body = head.decode("utf-8", "replace")
                     if resp.status == 429:
                         logger.warning(
                             f"Fluffle rate-limited (429), attempt "
@@ -233,14 +268,14 @@ class ImageSearcher:
 
     def _extract_credits(self, result: dict, platform: str) -> str:
         """Build an artist attribution string from Fluffle's ``credits`` array."""
-        credits = result.get("credits") or []
+        credits = (result.get("credits") or [])[:_MAX_CREDITS]
         names: List[str] = []
         for credit in credits:
             name = (credit.get("name") or "").strip()
             if not name:
                 continue
             # Strip e621's "_(artist)" suffix and drop non-artist meta tags.
-            cleaned = re.sub(r"_\(artist\)$", "", name)
+            cleaned = _ARTIST_SUFFIX_RE.sub("", name)
             if not cleaned or cleaned.lower() in META_ARTIST_TAGS:
                 continue
             names.append(cleaned)
@@ -260,6 +295,10 @@ class ImageSearcher:
         """Downscale / re-encode so the upload respects Fluffle's size limits."""
         try:
             img = Image.open(io.BytesIO(image_data))
+            # Decode large JPEGs straight at a reduced DCT scale; the LANCZOS
+            # resize below then only has to cover the remaining factor.
+            if img.format == "JPEG" and max(img.size) > FLUFFLE_MAX_DIMENSION:
+                img.draft("RGB", (FLUFFLE_MAX_DIMENSION, FLUFFLE_MAX_DIMENSION))
             if img.mode != "RGB":
                 img = img.convert("RGB")
 
@@ -283,4 +322,5 @@ class ImageSearcher:
         """Close the shared HTTP session."""
         if self._session and not self._session.closed:
             await self._session.close()
+        self._session = None
         logger.info("ImageSearcher cleaned up")
@@ -1,17 +1,23 @@
+import atexit
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from config import LOG_LEVEL, LOG_FORMAT
 
 def setup_logger():
+    level = getattr(logging, LOG_LEVEL)
+    formatter = logging.Formatter(LOG_FORMAT)
+
     # Create logger
     logger = logging.getLogger('SourceBot')
-    logger.setLevel(getattr(logging, LOG_LEVEL))
+    logger.setLevel(level)
+    # Records are emitted by our own handlers only, never again via the root logger.
+    logger.propagate = False
 
     # Create console handler
     console_handler = logging.StreamHandler()
-    console_handler.setLevel(getattr(logging, LOG_LEVEL))
-    console_formatter = logging.Formatter(LOG_FORMAT)
-    console_handler.setFormatter(console_formatter)
+    console_handler.setLevel(level)
+    console_handler.setFormatter(formatter)
 
     # Create file handler
     file_handler = RotatingFileHandler(
@@ -19,13 +25,18 @@ def setup_logger():
         maxBytes=1024 * 1024,  # 1MB
         backupCount=5
     )
-    file_handler.setLevel(getattr(logging, LOG_LEVEL))
-    file_formatter = logging.Formatter(LOG_FORMAT)
-    file_handler.setFormatter(file_formatter)
+    file_handler.setLevel(level)
+    file_handler.setFormatter(formatter)
+
+    # The real handlers do blocking writes (and renames on rotation), so run
+    # them on a listener thread; logging from the event loop is just a put.
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, console_handler, file_handler, respect_handler_level=True)
+    listener.start()
+    # Flush whatever is still queued on interpreter exit.
+    atexit.register(listener.stop)
 
-    # Add handlers to logger
-    logger.addHandler(console_handler)
-    logger.addHandler(file_handler)
+    logger.addHandler(QueueHandler(log_queue))
 
     return logger
 
@@ -0,0 +1,52 @@
+import re
+
+# Markdown links ([text](url)) in user captions, kept as links when escaping.
+# The URL may contain one level of balanced parentheses (".../a_(b)").
+_LINK_RE = re.compile(r'\[([^\]]*)\]\(((?:[^()\s]|\([^()\s]*\))*)\)')
+
+# Placeholder standing in for a preserved link while the rest is escaped.
+_PLACEHOLDER_RE = re.compile(r'\x00(\d+)\x00')
+
+# Translation table escaping every MarkdownV2 special character in a single pass.
+_MDV2_TRANS = str.maketrans({c: '\\' + c for c in '_*[]()~`>#+-=|{}.!'})
+# Inside the (...) part of an inline link only ')' and '\' must be escaped.
+_MDV2_URL_TRANS = str.maketrans({c: '\\' + c for c in '\\)'})
+
+
+def escape_markdown_v2(text: str) -> str:
+    """Escape special characters for MarkdownV2 format"""
+    return text.translate(_MDV2_TRANS)
+
+
+def escape_markdown_v2_url(url: str) -> str:
+    """Escape a URL for use as the target of a MarkdownV2 inline link"""
+    return url.translate(_MDV2_URL_TRANS)
+
+
+def escape_markdown_v2_preserve_links(text: str) -> str:
+    """Escape special characters for MarkdownV2 format while preserving links"""
+    if not text:
+        return ""
+
+    # First, temporarily replace markdown links with placeholders
+    links = []
+
+    def replace_link(match):
+        links.append(match)
+        # NUL-delimited so the escape pass below leaves the placeholder intact.
+        return f"\x00{len(links)-1}\x00"
+
+    text_with_placeholders = _LINK_RE.sub(replace_link, text)
+
+    # Escape special characters
+    escaped_text = text_with_placeholders.translate(_MDV2_TRANS)
+
+    # Restore links in a single pass, escaping text and URL by their own rules
+    if not links:
+        return escaped_text
+
+    def restore_link(m):
+        link = links[int(m.group(1))]
+        return f"[{escape_markdown_v2(link.group(1))}]({escape_markdown_v2_url(link.group(2))})"
+
+    return _PLACEHOLDER_RE.sub(restore_link, escaped_text)
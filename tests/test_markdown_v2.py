@@ -0,0 +1,70 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from markdown_v2 import (  # noqa: E402
+    escape_markdown_v2,
+    escape_markdown_v2_preserve_links,
+    escape_markdown_v2_url,
+)
+
+
+class EscapeMarkdownV2Test(unittest.TestCase):
+    def test_escapes_every_special_character(self):
+        self.assertEqual(
+            escape_markdown_v2("_*[]()~`>#+-=|{}.!"),
+            r"\_\*\[\]\(\)\~\`\>\#\+\-\=\|\{\}\.\!",
+        )
+
+    def test_url_escapes_only_paren_and_backslash(self):
+        self.assertEqual(
+            escape_markdown_v2_url(r"https://ex.com/a_(b)\c"),
+            r"https://ex.com/a_(b\)\\c",
+        )
+
+
+class PreserveLinksTest(unittest.TestCase):
+    def test_plain_text_is_fully_escaped(self):
+        self.assertEqual(escape_markdown_v2_preserve_links("Hi. (ok)!"), r"Hi\. \(ok\)\!")
+
+    def test_empty(self):
+        self.assertEqual(escape_markdown_v2_preserve_links(""), "")
+
+    def test_link_text_specials_are_escaped(self):
+        self.assertEqual(
+            escape_markdown_v2_preserve_links("art by [@some_artist](https://x.com/some_artist)!"),
+            r"art by [@some\_artist](https://x.com/some_artist)\!",
+        )
+
+    def test_link_text_with_punctuation(self):
+        self.assertEqual(
+            escape_markdown_v2_preserve_links("[v1.0 - final!](https://ex.com)"),
+            r"[v1\.0 \- final\!](https://ex.com)",
+        )
+
+    def test_url_with_balanced_parentheses(self):
+        self.assertEqual(
+            escape_markdown_v2_preserve_links("see [wiki](https://ex.com/a_(b)) now."),
+            r"see [wiki](https://ex.com/a_(b\)) now\.",
+        )
+
+    def test_url_with_backslash(self):
+        self.assertEqual(
+            escape_markdown_v2_preserve_links("[x](https://ex.com/a\\b)"),
+            r"[x](https://ex.com/a\\b)",
+        )
+
+    def test_multiple_links(self):
+        self.assertEqual(
+            escape_markdown_v2_preserve_links("[a_1](https://a.com) & [b.2](https://b.com/x)"),
+            r"[a\_1](https://a.com) & [b\.2](https://b.com/x)",
+        )
+
+    def test_unmatched_brackets_are_escaped_as_text(self):
+        self.assertEqual(escape_markdown_v2_preserve_links("[not a link]"), r"\[not a link\]")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,15 +1,133 @@
 import os
 import io
+import time
+import asyncio
 import aiohttp
-from typing import Optional
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Hashable, Optional
 from PIL import Image
 from logger import logger
 from config import MAX_FILE_SIZE
 
-async def download_image(file_id: str, bot) -> Optional[bytes]:
+# Read size used when streaming Telegram file downloads.
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# PIL decode/resize/encode is CPU-bound. It runs on this small dedicated pool so
+# it neither blocks the event loop nor competes with the default executor
+# (which aiohttp also uses for DNS lookups).
+IMAGE_WORKERS = min(4, os.cpu_count() or 1)
+image_executor = ThreadPoolExecutor(max_workers=IMAGE_WORKERS, thread_name_prefix="image")
+
+
+class TTLCache:
+    """Small dict-like cache whose entries expire ``ttl`` seconds after being set.
+
+    Once more than ``maxsize`` entries are stored, the oldest ones are evicted.
+    Every entry shares the same ``ttl`` and re-setting a key moves it to the
+    end, so insertion order is also expiry order.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+
+    def _get_live(self, key: Hashable) -> "Optional[tuple[float, Any]]":
+        """Return the (expires_at, value) entry for key, dropping it if expired."""
+        item = self._data.get(key)
+        if item is not None and item[0] <= time.monotonic():
+            del self._data[key]
+            return None
+        return item
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self._get_live(key) is not None
+
+    def __getitem__(self, key: Hashable) -> Any:
+        item = self._get_live(key)
+        if item is None:
+            raise KeyError(key)
+        return item[1]
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        self._data.pop(key, None)
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        """Number of live entries; expired ones are pruned from the front first."""
+        now = time.monotonic()
+        while self._data:
+            expires_at, _ = next(iter(self._data.values()))
+            if expires_at > now:
+                break
+            self._data.popitem(last=False)
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        item = self._get_live(key)
+        return default if item is None else item[1]
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        item = self._data.pop(key, None)
+        if item is None or item[0] <= time.monotonic():
+            return default
+        return item[1]
+
+
+def _process_image(buffer: io.BytesIO) -> bytes:
+    """Normalise a downloaded image to an RGB JPEG within Telegram's limits."""
+    # Process image using PIL
+    image = Image.open(buffer)
+    max_dimension = 4096  # Telegram's maximum image dimension
+
+    # Telegram photos are almost always already RGB JPEGs within bounds; hand
+    # those back untouched rather than paying a full decode + encode.
+    if image.format == 'JPEG' and image.mode == 'RGB' and max(image.size) <= max_dimension:
+        return buffer.getvalue()
+
+    # Let libjpeg decode oversized JPEGs at a reduced scale (1/2, 1/4, 1/8)
+    # that still covers max_dimension, instead of decoding at full size.
+    if image.format == 'JPEG' and max(image.size) > max_dimension:
+        image.draft('RGB', (max_dimension, max_dimension))
+
+    # Convert to RGB if necessary (handles PNG with alpha channel)
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        if image.mode == 'P':
+            image = image.convert('RGBA')
+        background.paste(image, mask=image.split()[-1])
+        image = background
+    elif image.mode != 'RGB':
+        image = image.convert('RGB')
+
+    # Resize if the image is too large
+    if max(image.size) > max_dimension:
+        ratio = max_dimension / max(image.size)
+        new_size = tuple(int(dim * ratio) for dim in image.size)
+        image = image.resize(new_size, Image.Resampling.LANCZOS)
+
+    # Save as JPEG in memory. This copy is only an intermediate (it is searched,
+    # not published), so skip the extra Huffman-optimisation pass.
+    output = io.BytesIO()
+    image.save(output, format='JPEG', quality=85, subsampling='4:2:0')
+    output.seek(0)
+
+    logger.debug("Image successfully processed for photo sending")
+    return output.read()
+
+
+async def download_image(
+    file_id: str, bot, session: Optional[aiohttp.ClientSession] = None
+) -> Optional[bytes]:
     """
     Download and process image from Telegram servers
     Returns image data optimized for photo sending
+
+    Pass the bot's shared ``session`` to reuse pooled keep-alive connections;
+    without one a throwaway session is opened for this download.
     """
     try:
         file = await bot.get_file(file_id)
@@ -18,42 +136,31 @@ async def download_image(file_id: str, bot) -> Optional[bytes]:
             logger.warning(f"File size {file.file_size} exceeds maximum allowed size")
             return None
 
-        async with aiohttp.ClientSession() as session:
+        own_session = session is None
+        if own_session:
+            session = aiohttp.ClientSession()
+        try:
             async with session.get(file.file_path) as response:
                 if response.status == 200:
-                    # Read image data
-                    image_data = await response.read()
-
-                    # Process image using PIL
-                    image = Image.open(io.BytesIO(image_data))
-
-                    # Convert to RGB if necessary (handles PNG with alpha channel)
-                    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
-                        background = Image.new('RGB', image.size, (255, 255, 255))
-                        if image.mode == 'P':
-                            image = image.convert('RGBA')
-                        background.paste(image, mask=image.split()[-1])
-                        image = background
-                    elif image.mode != 'RGB':
-                        image = image.convert('RGB')
-
-                    # Resize if the image is too large
-                    max_dimension = 4096  # Telegram's maximum image dimension
-                    if max(image.size) > max_dimension:
-                        ratio = max_dimension / max(image.size)
-                        new_size = tuple(int(dim * ratio) for dim in image.size)
-                        image = image.resize(new_size, Image.Resampling.LANCZOS)
-
-                    # Save as JPEG in memory with high quality
-                    output = io.BytesIO()
-                    image.save(output, format='JPEG', quality=95, optimize=True)
-                    output.seek(0)
-
-                    logger.debug("Image successfully processed for photo sending")
-                    return output.read()
+                    # Stream the body straight into the buffer PIL reads from,
+                    # enforcing the size cap even if Telegram's file_size was off.
+                    buffer = io.BytesIO()
+                    async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                        buffer.write(chunk)
+                        if buffer.tell() > MAX_FILE_SIZE:
+                            logger.warning("Download exceeded maximum allowed size, aborting")
+                            return None
+                    buffer.seek(0)
+
+                    # Decoding and re-encoding are blocking; keep them off the loop.
+                    loop = asyncio.get_running_loop()
+                    return await loop.run_in_executor(image_executor, _process_image, buffer)
                 else:
                     logger.error(f"Failed to download image: {response.status}")
                     return None
+        finally:
+            if own_session:
+                await session.close()
 
     except Exception as e:
         logger.error(f"Error downloading/processing image: {str(e)}")